@@ -63,6 +63,13 @@ def create_app():
         # Updated to use ping command which is more reliable
         mongo.cx.admin.command('ping')
         print(f"MongoDB connection successful to: {mongo_uri[:20]}...")
+
+        # Index the timetable for per-professor / per-subject views and day-ordered exports.
+        # create_index is a no-op when the index already exists.
+        timetable = mongo.db.timetable
+        timetable.create_index([('day', 1), ('timeslot', 1)])
+        timetable.create_index([('professor_name', 1), ('day', 1), ('timeslot', 1)])
+        timetable.create_index([('subject_name', 1), ('day', 1), ('timeslot', 1)])
     except ConnectionFailure as e:
         # Provide a more informative error message if the connection fails.
         raise ConnectionFailure(f"FATAL: Could not connect to MongoDB. Check your MONGO_URI and network access. Original error: {e}")
@@ -0,0 +1,146 @@
+import csv
+import hashlib
+import io
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+from openpyxl import Workbook
+
+from extensions import mongo
+from time_grid import WEEKDAYS, timeslot_to_numeric
+
+EXPORT_FIELDS = ['day', 'timeslot', 'subject_name', 'professor_name']
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'ics': 'text/calendar; charset=utf-8',
+}
+
+
+# --- TIMETABLE VERSION ---
+def get_timetable_version():
+    """Returns the current timetable version, used as the HTTP cache key for exports."""
+    doc = mongo.db.settings.find_one({'name': 'timetable_version'})
+    return doc.get('version', 0) if doc else 0
+
+def bump_timetable_version():
+    """Marks the stored timetable as changed so cached exports are revalidated."""
+    mongo.db.settings.update_one(
+        {'name': 'timetable_version'},
+        {'$inc': {'version': 1}},
+        upsert=True
+    )
+
+
+# --- CURSOR ITERATION ---
+def iter_timetable_entries(days, query=None):
+    """
+    Yields timetable entries in weekly order straight from Mongo cursors.
+    One cursor is opened per day so the full timetable is never held in memory;
+    'HH:MM-HH:MM' timeslot strings sort chronologically as plain strings.
+    """
+    projection = {field: 1 for field in EXPORT_FIELDS}
+    projection['_id'] = 0
+    for day in days:
+        day_query = dict(query or {}, day=day)
+        cursor = mongo.db.timetable.find(day_query, projection).sort('timeslot', 1)
+        for entry in cursor:
+            yield entry
+
+
+# --- FORMAT WRITERS ---
+def stream_csv(entries):
+    """Yields the entries as CSV text, one row at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for entry in entries:
+        writer.writerow([entry.get(field, '') for field in EXPORT_FIELDS])
+        yield flush()
+
+def stream_xlsx(entries, chunk_size=64 * 1024):
+    """
+    Yields an .xlsx workbook built in openpyxl write-only mode.
+    Rows are appended without building a cell tree; the finished file is
+    spooled to a temporary file and then read back in chunks.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Timetable')
+    sheet.append(EXPORT_FIELDS)
+    for entry in entries:
+        sheet.append([entry.get(field, '') for field in EXPORT_FIELDS])
+
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def _ics_escape(value):
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+def _ics_fold(line):
+    """Folds a content line to 75 octets per line, as required by RFC 5545."""
+    encoded = line.encode('utf-8')
+    parts = []
+    limit = 75
+    while len(encoded) > limit:
+        # Never split a multi-byte UTF-8 sequence
+        cut = limit
+        while (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut])
+        encoded = encoded[cut:]
+        limit = 74  # Continuation lines start with a space
+    parts.append(encoded)
+    return b'\r\n '.join(parts).decode('utf-8') + '\r\n'
+
+def _ics_uid(entry):
+    """A UID derived from the entry itself, so it is stable across feeds and versions."""
+    identity = '|'.join(str(entry.get(field, '')) for field in EXPORT_FIELDS)
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+def stream_ics(entries):
+    """
+    Yields an iCalendar feed with one weekly recurring event per timetable entry.
+    Events start in the current week and use floating (local) times.
+    """
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    weekday_index = {name: i for i, name in enumerate(WEEKDAYS)}
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    yield ('BEGIN:VCALENDAR\r\n'
+           'VERSION:2.0\r\n'
+           'PRODID:-//Timetable Generator//EN\r\n'
+           'CALSCALE:GREGORIAN\r\n')
+    for entry in entries:
+        if entry.get('day') not in weekday_index:
+            continue
+        start, end = timeslot_to_numeric(entry.get('timeslot'))
+        event_date = week_start + timedelta(days=weekday_index[entry['day']])
+        dtstart = datetime.combine(event_date, datetime.min.time()) + timedelta(minutes=start)
+        dtend = datetime.combine(event_date, datetime.min.time()) + timedelta(minutes=end)
+        yield ''.join(_ics_fold(line) for line in [
+            'BEGIN:VEVENT',
+            f'UID:{_ics_uid(entry)}@timetable-generator',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{dtstart:%Y%m%dT%H%M%S}',
+            f'DTEND:{dtend:%Y%m%dT%H%M%S}',
+            'RRULE:FREQ=WEEKLY',
+            f'SUMMARY:{_ics_escape(entry.get("subject_name", ""))}',
+            f'DESCRIPTION:{_ics_escape(entry.get("professor_name", ""))}',
+            'END:VEVENT'
+        ])
+    yield 'END:VCALENDAR\r\n'
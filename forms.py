@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, SelectField
+from wtforms import StringField, PasswordField, SubmitField, SelectField, SelectMultipleField, IntegerField
 from flask_wtf.file import FileField, FileRequired, FileAllowed
-from wtforms.validators import DataRequired, EqualTo, Regexp
+from wtforms.validators import DataRequired, EqualTo, Regexp, NumberRange
 
 class LoginForm(FlaskForm):
     """Form for user login."""
@@ -28,13 +28,8 @@ class FileUploadForm(FlaskForm):
 class ConstraintForm(FlaskForm):
     """Form for setting professor availability constraints."""
     professor = SelectField('Professor', validators=[DataRequired()])
-    day = SelectField('Day', choices=[
-        ('Monday', 'Monday'),
-        ('Tuesday', 'Tuesday'),
-        ('Wednesday', 'Wednesday'),
-        ('Thursday', 'Thursday'),
-        ('Friday', 'Friday')
-    ], validators=[DataRequired()])
+    # Choices are filled in from the configured time grid
+    day = SelectField('Day', validators=[DataRequired()])
     start_time = StringField('Start Time (HH:MM)', validators=[DataRequired(), Regexp(r'^\d{2}:\d{2}$', message='Format must be HH:MM')])
     end_time = StringField('End Time (HH:MM)', validators=[DataRequired(), Regexp(r'^\d{2}:\d{2}$', message='Format must be HH:MM')])
     submit = SubmitField('Add Constraint')
@@ -47,4 +42,23 @@ class TimeSettingsForm(FlaskForm):
     lunch_end_time = StringField('Lunch End Time', validators=[DataRequired(), time_format_validator])
     recess_start_time = StringField('Recess Start Time', validators=[DataRequired(), time_format_validator])
     recess_end_time = StringField('Recess End Time', validators=[DataRequired(), time_format_validator])
-    submit = SubmitField('Update Break Times')
\ No newline at end of file
+    submit = SubmitField('Update Break Times')
+
+class GridSettingsForm(FlaskForm):
+    """Form for configuring the weekly time grid."""
+    time_format_validator = Regexp(r'^\d{2}:\d{2}$', message='Format must be HH:MM')
+
+    days = SelectMultipleField('Teaching Days', choices=[
+        ('Monday', 'Monday'),
+        ('Tuesday', 'Tuesday'),
+        ('Wednesday', 'Wednesday'),
+        ('Thursday', 'Thursday'),
+        ('Friday', 'Friday'),
+        ('Saturday', 'Saturday'),
+        ('Sunday', 'Sunday')
+    ], validators=[DataRequired()])
+    day_start_time = StringField('Day Start Time', validators=[DataRequired(), time_format_validator])
+    day_end_time = StringField('Day End Time', validators=[DataRequired(), time_format_validator])
+    period_minutes = IntegerField('Period Length (minutes)', validators=[DataRequired(), NumberRange(min=5, max=240)])
+    lab_minutes = IntegerField('Lab Length (minutes)', validators=[DataRequired(), NumberRange(min=5, max=480)])
+    submit = SubmitField('Update Time Grid')
\ No newline at end of file
@@ -1,8 +1,9 @@
 import os
 import re
+import hashlib
 import pandas as pd
 from functools import wraps
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, Response, stream_with_context, abort, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash
 from werkzeug.utils import secure_filename
@@ -12,26 +13,15 @@ from collections import defaultdict
 # Import from extensions.py and other modules
 from extensions import mongo
 from models import User
-from forms import LoginForm, SignUpForm, FileUploadForm, ConstraintForm, TimeSettingsForm
-from genetic_algorithm import run_genetic_algorithm, parse_time, timeslot_to_numeric
+from forms import LoginForm, SignUpForm, FileUploadForm, ConstraintForm, TimeSettingsForm, GridSettingsForm
+from genetic_algorithm import run_genetic_algorithm
+from time_grid import DEFAULT_GRID_SETTINGS, DEFAULT_BREAK_SETTINGS, get_time_grid, parse_time
+from exports import (EXPORT_MIMETYPES, get_timetable_version, bump_timetable_version,
+                     iter_timetable_entries, stream_csv, stream_xlsx, stream_ics)
 
 # Create a Blueprint
 main_bp = Blueprint('main', __name__)
 
-# --- Master lists for Days and Timeslots ---
-DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-# This is now the base list of all possible slots in a day
-TIME_SLOTS = [
-    '10:00-11:00',
-    '11:00-12:00',
-    '12:00-13:00',
-    '13:00-14:00',
-    '14:00-15:00',
-    '15:00-16:00',
-    '16:00-16:15',
-    '16:15-17:15'
-]
-
 
 # --- DECORATORS ---
 def admin_required(f):
@@ -88,6 +78,17 @@ def logout():
 
 # --- DASHBOARD ROUTES ---
 
+def _timetable_filter_from_args():
+    """Builds a timetable query from the optional ?professor= and ?subject= arguments."""
+    query = {}
+    professor = request.args.get('professor', '').strip()
+    subject = request.args.get('subject', '').strip()
+    if professor:
+        query['professor_name'] = professor
+    if subject:
+        query['subject_name'] = subject
+    return query
+
 @main_bp.route('/')
 @main_bp.route('/dashboard')
 @login_required
@@ -95,16 +96,75 @@ def dashboard():
     # Remove the automatic redirect to admin panel for admins
     # Let both admin and regular users see the dashboard
     
-    timetable_data = list(mongo.db.timetable.find())
+    # Filtered views are served by the professor_name / subject_name indexes
+    query = _timetable_filter_from_args()
+    timetable_data = mongo.db.timetable.find(query, {'_id': 0})
+    grid = get_time_grid()
     
     # Since only one lecture can be in a slot, we no longer need a list
-    schedule = {day: {ts: None for ts in TIME_SLOTS} for day in DAYS_OF_WEEK}
+    schedule = {day: {ts: None for ts in grid.timeslots} for day in grid.days}
     for entry in timetable_data:
         if entry.get('day') in schedule and entry.get('timeslot') in schedule[entry.get('day')]:
             schedule[entry['day']][entry['timeslot']] = entry
 
+    professors = sorted(p['name'] for p in mongo.db.professors.find({}, {'name': 1}))
+    subjects = sorted(s['name'] for s in mongo.db.subjects.find({}, {'name': 1}))
+
     return render_template('dashboard.html', title='Dashboard',
-                           schedule=schedule, days=DAYS_OF_WEEK, timeslots=TIME_SLOTS)
+                           schedule=schedule, days=grid.days, timeslots=grid.timeslots,
+                           professors=professors, subjects=subjects,
+                           selected_professor=query.get('professor_name', ''),
+                           selected_subject=query.get('subject_name', ''))
+
+@main_bp.route('/api/timetable')
+@login_required
+def timetable_api():
+    """JSON variant of the dashboard, accepting the same ?professor= / ?subject= filters."""
+    query = _timetable_filter_from_args()
+    entries = list(mongo.db.timetable.find(query, {'_id': 0, 'day': 1, 'timeslot': 1,
+                                                   'subject_name': 1, 'professor_name': 1}))
+    grid = get_time_grid()
+    return jsonify({
+        'days': grid.days,
+        'timeslots': grid.timeslots,
+        'filters': query,
+        'entries': entries
+    })
+
+
+# --- EXPORT ROUTES ---
+@main_bp.route('/export/timetable.<fmt>')
+@login_required
+def export_timetable(fmt):
+    """
+    Streams an export of the timetable, filtered by the same ?professor= / ?subject=
+    arguments as the dashboard and honouring ETags keyed on the timetable version.
+    """
+    if fmt not in EXPORT_MIMETYPES:
+        abort(404)
+
+    query = _timetable_filter_from_args()
+    filter_key = '|'.join(f'{k}={v}' for k, v in sorted(query.items()))
+    etag = f'{fmt}-{get_timetable_version()}-{hashlib.sha1(filter_key.encode("utf-8")).hexdigest()}'
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        entries = iter_timetable_entries(get_time_grid().days, query)
+        if fmt == 'csv':
+            body = stream_csv(entries)
+        elif fmt == 'xlsx':
+            body = stream_xlsx(entries)
+        else:
+            body = stream_ics(entries)
+        filename = secure_filename('_'.join(['timetable', *(query[k] for k in sorted(query))])) or 'timetable'
+        response = Response(stream_with_context(body), mimetype=EXPORT_MIMETYPES[fmt])
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+
+    response.set_etag(etag)
+    # Exports sit behind login, so only the client may cache them and must revalidate each time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 # --- ADMIN PANEL ROUTES ---
@@ -115,20 +175,21 @@ def admin_panel():
     upload_form = FileUploadForm()
     constraint_form = ConstraintForm()
     settings_form = TimeSettingsForm()
-
-    # Fetch break time settings to pre-populate the form
-    settings = mongo.db.settings.find_one({'name': 'breaks'})
-    if settings:
-        settings_form.lunch_start_time.data = settings.get('lunch_start_time')
-        settings_form.lunch_end_time.data = settings.get('lunch_end_time')
-        settings_form.recess_start_time.data = settings.get('recess_start_time')
-        settings_form.recess_end_time.data = settings.get('recess_end_time')
-    else:
-        # Default values if nothing is in the database
-        settings_form.lunch_start_time.data = '13:00'
-        settings_form.lunch_end_time.data = '14:00'
-        settings_form.recess_start_time.data = '16:00'
-        settings_form.recess_end_time.data = '16:15'
+    grid_form = GridSettingsForm()
+
+    # Fetch break time settings to pre-populate the form, falling back to the defaults
+    settings = {**DEFAULT_BREAK_SETTINGS, **(mongo.db.settings.find_one({'name': 'breaks'}) or {})}
+    settings_form.lunch_start_time.data = settings.get('lunch_start_time')
+    settings_form.lunch_end_time.data = settings.get('lunch_end_time')
+    settings_form.recess_start_time.data = settings.get('recess_start_time')
+    settings_form.recess_end_time.data = settings.get('recess_end_time')
+
+    grid_settings = {**DEFAULT_GRID_SETTINGS, **(mongo.db.settings.find_one({'name': 'grid'}) or {})}
+    grid_form.days.data = grid_settings.get('days')
+    grid_form.day_start_time.data = grid_settings.get('day_start_time')
+    grid_form.day_end_time.data = grid_settings.get('day_end_time')
+    grid_form.period_minutes.data = grid_settings.get('period_minutes')
+    grid_form.lab_minutes.data = grid_settings.get('lab_minutes')
 
     professors = list(mongo.db.professors.find())
     constraints_data = list(mongo.db.constraints.find())
@@ -140,35 +201,85 @@ def admin_panel():
     sorted_prof_subject_map = dict(sorted(prof_subject_map.items()))
 
     constraint_form.professor.choices = [(str(p['_id']), p['name']) for p in professors]
+    constraint_form.day.choices = [(day, day) for day in get_time_grid().days]
 
     return render_template('admin.html', title='Admin Panel',
                            upload_form=upload_form, 
                            constraint_form=constraint_form,
                            settings_form=settings_form,
+                           grid_form=grid_form,
                            prof_subject_map=sorted_prof_subject_map,
                            constraints=constraints_data)
 
+def _save_grid_settings(name, defaults, values, success_message):
+    """
+    Saves the 'grid' or 'breaks' settings document and removes only the timetable
+    entries whose day/timeslot no longer exists in the recompiled grid.
+    Nothing is written when the submitted values match what is stored.
+    """
+    stored = {**defaults, **(mongo.db.settings.find_one({'name': name}) or {})}
+    if all(stored.get(key) == value for key, value in values.items()):
+        flash('No changes to save.', 'info')
+        return
+
+    old_grid = get_time_grid()
+    mongo.db.settings.update_one({'name': name}, {'$set': values}, upsert=True)
+    new_grid = get_time_grid()
+    flash(success_message, 'success')
+
+    if old_grid.days == new_grid.days and old_grid.slot_labels == new_grid.slot_labels:
+        return
+
+    # Every day shares the same periods, so an entry fits if both its day and its timeslot still exist
+    removed = mongo.db.timetable.delete_many({'$or': [
+        {'day': {'$nin': new_grid.days}},
+        {'timeslot': {'$nin': new_grid.slot_labels}}
+    ]}).deleted_count
+    if removed:
+        bump_timetable_version()
+        flash(f'{removed} timetable entries no longer fit the new time grid and were removed. '
+              'Please regenerate the timetable.', 'warning')
+
 @main_bp.route('/admin/settings', methods=['POST'])
 @login_required
 @admin_required
 def update_settings():
     form = TimeSettingsForm()
     if form.validate_on_submit():
-        mongo.db.settings.update_one(
-            {'name': 'breaks'},
-            {'$set': {
-                'lunch_start_time': form.lunch_start_time.data,
-                'lunch_end_time': form.lunch_end_time.data,
-                'recess_start_time': form.recess_start_time.data,
-                'recess_end_time': form.recess_end_time.data
-            }},
-            upsert=True
-        )
-        flash('Break time settings have been updated!', 'success')
+        _save_grid_settings('breaks', DEFAULT_BREAK_SETTINGS, {
+            'lunch_start_time': form.lunch_start_time.data,
+            'lunch_end_time': form.lunch_end_time.data,
+            'recess_start_time': form.recess_start_time.data,
+            'recess_end_time': form.recess_end_time.data
+        }, 'Break time settings have been updated!')
     else:
         flash('There was an error in the time format.', 'danger')
     return redirect(url_for('main.admin_panel'))
 
+@main_bp.route('/admin/grid', methods=['POST'])
+@login_required
+@admin_required
+def update_grid_settings():
+    form = GridSettingsForm()
+    if form.validate_on_submit():
+        if parse_time(form.day_start_time.data) >= parse_time(form.day_end_time.data):
+            flash('The day must end after it starts.', 'danger')
+            return redirect(url_for('main.admin_panel'))
+        if form.lab_minutes.data % form.period_minutes.data != 0:
+            flash('The lab length must be a whole number of periods.', 'danger')
+            return redirect(url_for('main.admin_panel'))
+
+        _save_grid_settings('grid', DEFAULT_GRID_SETTINGS, {
+            'days': form.days.data,
+            'day_start_time': form.day_start_time.data,
+            'day_end_time': form.day_end_time.data,
+            'period_minutes': form.period_minutes.data,
+            'lab_minutes': form.lab_minutes.data
+        }, 'Time grid settings have been updated!')
+    else:
+        flash('There was an error in the time grid settings.', 'danger')
+    return redirect(url_for('main.admin_panel'))
+
 
 @main_bp.route('/admin/upload', methods=['POST'])
 @login_required
@@ -182,6 +293,7 @@ def upload_timetable():
         mongo.db.required_lectures.delete_many({})
         mongo.db.constraints.delete_many({})
         mongo.db.timetable.delete_many({})
+        bump_timetable_version()
         
         try:
             f = form.file.data
@@ -234,6 +346,7 @@ def add_constraint():
     form = ConstraintForm()
     professors = list(mongo.db.professors.find())
     form.professor.choices = [(str(p['_id']), p['name']) for p in professors]
+    form.day.choices = [(day, day) for day in get_time_grid().days]
 
     if form.validate_on_submit():
         prof = mongo.db.professors.find_one({'_id': ObjectId(form.professor.data)})
@@ -259,6 +372,7 @@ def generate_new_timetable():
     
     try:
         mongo.db.timetable.delete_many({})
+        bump_timetable_version()
         required_lectures = list(mongo.db.required_lectures.find())
         constraints = list(mongo.db.constraints.find())
 
@@ -266,30 +380,14 @@ def generate_new_timetable():
             flash('Cannot generate timetable. Please upload lectures first.', 'danger')
             return redirect(url_for('main.admin_panel'))
 
-        settings = mongo.db.settings.find_one({'name': 'breaks'}) or {}
-        lunch_start = parse_time(settings.get('lunch_start_time', '13:00'))
-        lunch_end = parse_time(settings.get('lunch_end_time', '14:00'))
-        recess_start = parse_time(settings.get('recess_start_time', '16:00'))
-        recess_end = parse_time(settings.get('recess_end_time', '16:15'))
-
-        schedulable_slots = []
-        for slot_str in TIME_SLOTS:
-            slot_start, slot_end = timeslot_to_numeric(slot_str)
-            if slot_end - slot_start != 60: continue # Only consider 1-hour base slots for scheduling
-            
-            is_in_lunch = max(slot_start, lunch_start) < min(slot_end, lunch_end)
-            is_in_recess = max(slot_start, recess_start) < min(slot_end, recess_end)
-
-            if not is_in_lunch and not is_in_recess:
-                schedulable_slots.append(slot_str)
-        
-        # The new GA handles all complex logic internally
-        fittest_timetable = run_genetic_algorithm(required_lectures, constraints, schedulable_slots, DAYS_OF_WEEK)
+        # The compiled grid already excludes breaks and knows which periods can hold a lab
+        fittest_timetable = run_genetic_algorithm(required_lectures, constraints, get_time_grid())
         
         if not fittest_timetable:
             flash('Could not generate a valid timetable. The constraints may be too strict or there are not enough available slots for all lectures.', 'danger')
         else:
             mongo.db.timetable.insert_many(fittest_timetable)
+            bump_timetable_version()
             flash('New timetable generated successfully!', 'success')
 
     except ValueError as e:
@@ -0,0 +1,149 @@
+from extensions import mongo
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Defaults reproduce the original hardcoded Monday-Friday, 10:00-17:15 grid
+DEFAULT_GRID_SETTINGS = {
+    'days': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'],
+    'day_start_time': '10:00',
+    'day_end_time': '17:15',
+    'period_minutes': 60,
+    'lab_minutes': 120
+}
+DEFAULT_BREAK_SETTINGS = {
+    'lunch_start_time': '13:00',
+    'lunch_end_time': '14:00',
+    'recess_start_time': '16:00',
+    'recess_end_time': '16:15'
+}
+
+
+def parse_time(time_str):
+    try:
+        h, m = map(int, time_str.split(':'))
+        return h * 60 + m
+    except (ValueError, AttributeError):
+        return 0
+
+def format_time(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+def timeslot_to_numeric(timeslot_str):
+    try:
+        start_str, end_str = timeslot_str.split('-')
+        return parse_time(start_str.strip()), parse_time(end_str.strip())
+    except (ValueError, AttributeError):
+        return 0, 0
+
+
+class TimeGrid:
+    """
+    A compiled weekly grid. Schedulable periods are numbered 0..n-1 in
+    chronological order and described by parallel integer lists, so the
+    genetic algorithm never has to parse or compare time strings.
+    """
+    def __init__(self, days, timeslots, slot_day, slot_start, slot_end, lab_windows, lab_periods):
+        self.days = days                  # Day names, in week order
+        self.timeslots = timeslots        # Row labels for display, including breaks
+        self.slot_day = slot_day          # Day index of each schedulable period
+        self.slot_start = slot_start      # Start minute of each schedulable period
+        self.slot_end = slot_end          # End minute of each schedulable period
+        self.lab_windows = lab_windows    # Tuples of back-to-back period indices long enough for a lab
+        self.lab_periods = lab_periods
+        self.slot_labels = [f'{format_time(s)}-{format_time(e)}' for s, e in zip(slot_start, slot_end)]
+
+    def __len__(self):
+        return len(self.slot_day)
+
+    def blocked_slots(self, constraints):
+        """Maps each professor name to the set of period indices they are unavailable for."""
+        day_index = {day: i for i, day in enumerate(self.days)}
+        blocked = {}
+        for const in constraints:
+            d = day_index.get(const.get('day'))
+            if d is None:
+                continue
+            const_start, const_end = parse_time(const.get('start_time')), parse_time(const.get('end_time'))
+            slots = blocked.setdefault(const['professor_name'], set())
+            for i in range(len(self)):
+                if self.slot_day[i] == d and max(self.slot_start[i], const_start) < min(self.slot_end[i], const_end):
+                    slots.add(i)
+        return blocked
+
+
+def compile_time_grid(grid_settings=None, break_settings=None):
+    """Builds a TimeGrid from the 'grid' and 'breaks' settings documents."""
+    grid_settings = {**DEFAULT_GRID_SETTINGS, **(grid_settings or {})}
+    break_settings = {**DEFAULT_BREAK_SETTINGS, **(break_settings or {})}
+
+    days = [day for day in WEEKDAYS if day in grid_settings['days']]
+    day_start = parse_time(grid_settings['day_start_time'])
+    day_end = parse_time(grid_settings['day_end_time'])
+    period = max(int(grid_settings['period_minutes']), 1)
+    lab_periods = max(-(-int(grid_settings['lab_minutes']) // period), 1)
+
+    breaks = sorted(
+        (parse_time(break_settings[f'{name}_start_time']), parse_time(break_settings[f'{name}_end_time']))
+        for name in ('lunch', 'recess')
+    )
+    # Clamp breaks to the teaching day so their rows never run past it
+    breaks = [(max(start, day_start), min(end, day_end)) for start, end in breaks]
+    breaks = [(start, end) for start, end in breaks if start < end]
+
+    # Walk the day, emitting whole periods and jumping over breaks
+    timeslots = []
+    periods = []
+    t = day_start
+    while t < day_end:
+        current_break = next(((s, e) for s, e in breaks if s <= t < e), None)
+        if current_break:
+            timeslots.append(f'{format_time(t)}-{format_time(current_break[1])}')
+            t = current_break[1]
+            continue
+        boundary = min([s for s, _ in breaks if s > t] + [day_end])
+        if t + period > boundary:
+            # Too short for a period: show it as its own non-schedulable row
+            timeslots.append(f'{format_time(t)}-{format_time(boundary)}')
+            t = boundary
+            continue
+        timeslots.append(f'{format_time(t)}-{format_time(t + period)}')
+        periods.append((t, t + period))
+        t += period
+
+    slot_day, slot_start, slot_end = [], [], []
+    for d in range(len(days)):
+        for start, end in periods:
+            slot_day.append(d)
+            slot_start.append(start)
+            slot_end.append(end)
+
+    lab_windows = []
+    for i in range(len(slot_day) - lab_periods + 1):
+        window = tuple(range(i, i + lab_periods))
+        if all(slot_day[j] == slot_day[i] and slot_end[j] == slot_start[j + 1] for j in window[:-1]):
+            lab_windows.append(window)
+
+    return TimeGrid(days, timeslots, slot_day, slot_start, slot_end, lab_windows, lab_periods)
+
+
+# Compiled grid, reused until the settings documents change
+_grid_cache = {'key': None, 'grid': None}
+
+def _settings_key(grid_settings, break_settings):
+    grid = {**DEFAULT_GRID_SETTINGS, **grid_settings}
+    breaks = {**DEFAULT_BREAK_SETTINGS, **break_settings}
+    return (tuple(grid['days']),) + tuple(grid[k] for k in sorted(grid) if k != 'days') + \
+        tuple(breaks[k] for k in sorted(breaks))
+
+def get_time_grid():
+    """Returns the compiled TimeGrid for the stored settings, recompiling only when they change."""
+    docs = {doc['name']: doc for doc in mongo.db.settings.find(
+        {'name': {'$in': ['grid', 'breaks']}}, {'_id': 0})}
+    grid_settings = {k: v for k, v in docs.get('grid', {}).items() if k in DEFAULT_GRID_SETTINGS}
+    break_settings = {k: v for k, v in docs.get('breaks', {}).items() if k in DEFAULT_BREAK_SETTINGS}
+
+    key = _settings_key(grid_settings, break_settings)
+    if _grid_cache['key'] != key:
+        _grid_cache['grid'] = compile_time_grid(grid_settings, break_settings)
+        _grid_cache['key'] = key
+    return _grid_cache['grid']